@@ -4,22 +4,31 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from contextlib import suppress
+from functools import lru_cache
 from logging import DEBUG, basicConfig, getLogger
+from os import fspath, scandir, sep
 from pathlib import Path
-from re import match
-from subprocess import run
+from re import IGNORECASE
+from re import compile as re_compile
+from subprocess import PIPE, STDOUT, CalledProcessError, TimeoutExpired, run
+from sys import intern
+from threading import Lock
 from typing import TYPE_CHECKING, Any
 
-from yaml import YAMLError, safe_load
-
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Iterable, Iterator
 
 LOG = getLogger(__name__)
 SUPPORTED_MEDIUM = ("animation", "audio", "image", "video")
 SUPPORTED_TOOLS = ("ffmpeg", "imagemagick")
 TOOL_LOG: str = "replicator-tool-log.txt"
+TOOL_LOG_PATH = Path(TOOL_LOG)
+# tools can be run from multiple threads
+_TOOL_LOG_LOCK = Lock()
+# used to check that recipe entries are filesystem safe
+_SAFE_NAME_RE = re_compile(r"[a-zA-Z0-9-]+")
+# used to parse resolutions such as '1280x768'
+_RESOLUTION_RE = re_compile(r"0*[1-9][0-9]*x0*[1-9][0-9]*", IGNORECASE)
 
 
 class RecipeError(Exception):
@@ -35,8 +44,7 @@ class Recipe:
     It stores flags and variations that used to create a corpus based on a template."""
 
     __slots__ = (
-        "_flags",
-        "_variations",
+        "_expanded",
         "codec",
         "container",
         "library",
@@ -46,15 +54,11 @@ class Recipe:
 
     def __init__(self, file: Path) -> None:  # pylint: disable=too-many-branches
         LOG.debug("loading recipe '%s'", file)
-        # load data from yml file
-        try:
-            data: dict[str, Any] = safe_load(file.read_text()) or {}
-        except (UnicodeDecodeError, YAMLError):
-            raise RecipeError("Invalid YAML file") from None
+        data = _load_recipe_data(file)
 
         try:
-            self._flags: dict[str, Any] = data["base"]["default_flags"] or {}
-            self._variations: dict[str, Any] = data["variation"] or {}
+            default_flags: dict[str, Any] = data["base"]["default_flags"] or {}
+            variations: dict[str, Any] = data["variation"] or {}
             # codec
             self.codec: str = data["base"]["codec"]
             # container type
@@ -79,20 +83,21 @@ class Recipe:
                             f"Recipe 'default_flags' '{group}' is incomplete"
                         )
                     # all flags must be strings
-                    if not all(isinstance(x, str) for x in flags):
+                    if not _all_str(flags):
                         raise RecipeError(
                             f"Recipe 'default_flags' '{group}' has invalid flags"
                         )
             # check required properties are strings (must be filesystem safe)
-            elif not isinstance(entry, str) or not match(r"^[a-zA-Z0-9-]+$", entry):
+            elif not isinstance(entry, str) or not _SAFE_NAME_RE.fullmatch(entry):
                 raise RecipeError(f"Recipe '{key}' entry is invalid")
 
-        # validate variations
-        if not self._variations:
+        # validate variations and build default flags for each variation flag group
+        if not variations:
             raise RecipeError("Recipe missing variations")
-        for key, entry in self._variations.items():
+        base_flags: dict[str, tuple[str, ...]] = {}
+        for key, entry in variations.items():
             # validate "variation" flag group names (must be filesystem safe)
-            if not match(r"^[a-zA-Z0-9-]+$", key):
+            if not _SAFE_NAME_RE.fullmatch(key):
                 raise RecipeError(f"Recipe variation name '{key}' is invalid")
             # each "variation" entry must have a flag group with entries
             if not entry:
@@ -105,8 +110,15 @@ class Recipe:
                 if not isinstance(flags, list):
                     raise RecipeError(f"Recipe variation '{key}' is invalid")
                 # all flags must be strings
-                if not all(isinstance(x, str) for x in flags):
+                if not _all_str(flags):
                     raise RecipeError(f"Recipe variation '{key}' has invalid flags")
+            # default flags from a group with the same name are replaced
+            base_flags[intern(key)] = tuple(
+                flag
+                for group, flags in default_flags.items()
+                if group != key
+                for flag in flags
+            )
 
         if self.medium not in SUPPORTED_MEDIUM:
             raise RecipeError(f"Recipe medium '{self.medium}' unsupported")
@@ -114,19 +126,40 @@ class Recipe:
         if self.tool not in SUPPORTED_TOOLS:
             raise RecipeError(f"Recipe tool '{self.tool}' unsupported")
 
-    def __iter__(self) -> Iterator[tuple[str, int, list[str]]]:
-        for flag_group, variations in self._variations.items():
-            # add default flags
-            base_flags = []
-            for default_group, default_flags in self._flags.items():
-                if default_group != flag_group:
-                    base_flags.extend(default_flags)
-            # iterate over variations and build commands
-            for idx, flags in enumerate(variations):
-                yield flag_group, idx, base_flags + flags
+        # recipes do not change once loaded so build the flags for each variation
+        # base_flags was built from variations so the group order matches
+        self._expanded = tuple(
+            (flag_group, idx, defaults + tuple(flags))
+            for (flag_group, defaults), entry in zip(
+                base_flags.items(), variations.values()
+            )
+            for idx, flags in enumerate(entry)
+        )
+
+    def __iter__(self) -> Iterator[tuple[str, int, tuple[str, ...]]]:
+        return iter(self._expanded)
 
     def __len__(self) -> int:
-        return sum(True for _ in self)
+        return len(self._expanded)
+
+    @classmethod
+    def load(cls, file: Path) -> Recipe:
+        """Load a Recipe from a file. Recipes are cached and only reloaded if the
+        file has been modified.
+
+        Args:
+            file: Recipe file to load.
+
+        Returns:
+            Recipe loaded from file.
+        """
+        stat = file.stat()
+        return cls._load(file.resolve(), stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _load(cls, file: Path, _mtime: int, _size: int) -> Recipe:
+        return cls(file)
 
 
 class Template:
@@ -156,10 +189,12 @@ class Template:
 class CorpusGenerator(ABC):
     """Tool wrapper base class."""
 
-    __slots__ = ("_dest", "_recipe", "_templates")
+    __slots__ = ("_dest", "_dest_prefix", "_recipe", "_templates")
 
     def __init__(self, recipe: Recipe, dest: Path) -> None:
         self._dest = dest
+        # output file names are built as strings to avoid creating extra Paths
+        self._dest_prefix = f"{fspath(dest)}{sep}"
         self._recipe = recipe
         self._templates: list[Template] = []
 
@@ -174,6 +209,28 @@ class CorpusGenerator(ABC):
         """
         self._templates.append(template)
 
+    def _iter_outputs(
+        self, template: Template
+    ) -> Iterator[tuple[tuple[str, ...], str]]:
+        """Combine a template with each variation in the recipe.
+
+        Args:
+            template: Template to use as input.
+
+        Yields:
+            Flags and output file for each variation.
+        """
+        recipe = self._recipe
+        ext = recipe.container
+        # common output prefix 'dest/medium-codec-library-template'
+        prefix = (
+            f"{self._dest_prefix}{recipe.medium}-{recipe.codec}-"
+            f"{recipe.library}-{template.name}"
+        )
+        for flag, idx, variation in recipe:
+            # build dest file name 'video-h264-library-noise-resolution-##.mp4'
+            yield variation, f"{prefix}-{flag}-{idx:02d}.{ext}"
+
     @abstractmethod
     def generate(self) -> Iterator[Path]:
         """Generate corpus files."""
@@ -194,6 +251,47 @@ class CorpusGenerator(ABC):
         )
 
 
+def _all_str(values: Iterable[Any]) -> bool:
+    """Check that all values are strings. YAML only creates str objects so the type
+    is compared directly instead of using isinstance().
+
+    Args:
+        values: Values to check.
+
+    Returns:
+        True if all values are strings otherwise False.
+    """
+    return all(type(x) is str for x in values)  # pylint: disable=unidiomatic-typecheck
+
+
+def _load_recipe_data(file: Path) -> dict[str, Any]:
+    """Load data from a recipe file.
+
+    Args:
+        file: Recipe file to load.
+
+    Returns:
+        Data loaded from the recipe file.
+    """
+    # yaml is imported here since it is slow to import and only needed
+    # when recipes are loaded
+    # pylint: disable=import-outside-toplevel
+    from yaml import YAMLError, load
+
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # pragma: no cover
+        # libyaml is not available
+        from yaml import SafeLoader  # type: ignore[assignment]
+
+    try:
+        # libyaml handles decoding so pass raw bytes
+        data: dict[str, Any] = load(file.read_bytes(), Loader=SafeLoader) or {}
+    except (UnicodeDecodeError, YAMLError):
+        raise RecipeError("Invalid YAML file") from None
+    return data
+
+
 def init_logging(level: int) -> None:
     """Initialize logging
 
@@ -221,11 +319,7 @@ def is_resolution(in_res: str) -> bool:
     Returns:
         True is provided string is a valid resolution otherwise False.
     """
-    with suppress(ValueError):
-        x_res, y_res = in_res.lower().split("x")
-        if int(x_res) > 0 and int(y_res) > 0:
-            return True
-    return False
+    return _RESOLUTION_RE.fullmatch(in_res) is not None
 
 
 def list_recipes() -> Iterator[Path]:
@@ -239,9 +333,10 @@ def list_recipes() -> Iterator[Path]:
     """
     path = Path(__file__).parent.resolve() / "recipes"
     if path.is_dir():
-        for recipe in path.iterdir():
-            if recipe.suffix.lower().endswith(".yml"):
-                yield recipe
+        with scandir(path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(".yml") and entry.is_file():
+                    yield Path(entry.path)
 
 
 def run_tool(cmd: list[str]) -> None:
@@ -253,11 +348,24 @@ def run_tool(cmd: list[str]) -> None:
     Returns:
         None
     """
-    log_file = Path(TOOL_LOG)
-    with log_file.open("wb") as log_fp:
+    # avoid building the command string when it will not be logged
+    if LOG.isEnabledFor(DEBUG):
         LOG.debug("running '%s'", " ".join(cmd))
+    try:
         # use a timeout in case (frame or time) limit flags are forgotten
         # typically this should finish in a few seconds
-        run(cmd, check=True, stderr=log_fp, stdout=log_fp, timeout=600)
-    # on success we don't need the log so remove it
-    log_file.unlink()
+        # close_fds=False allows the use of posix_spawn() when cmd[0] is a full
+        # path, this is safe since fds created by Python are not inheritable
+        run(
+            cmd,
+            check=True,
+            close_fds=False,
+            stderr=STDOUT,
+            stdout=PIPE,
+            timeout=600,
+        )
+    except (CalledProcessError, TimeoutExpired) as exc:
+        # output is only needed on failure
+        with _TOOL_LOG_LOCK:
+            TOOL_LOG_PATH.write_bytes(exc.output or b"")
+        raise
@@ -3,17 +3,22 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 from __future__ import annotations
 
-from argparse import ArgumentParser, Namespace
-from filecmp import cmp
-from importlib.metadata import PackageNotFoundError, version
+from argparse import SUPPRESS, Action, ArgumentParser, Namespace
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from hashlib import blake2b
 from itertools import product
 from logging import DEBUG, INFO, getLogger
+from mmap import ACCESS_READ, mmap
+from os import cpu_count, fstat, scandir
 from pathlib import Path
-from typing import TYPE_CHECKING
+from sys import version_info
+from typing import TYPE_CHECKING, Any
 
 from .common import (
     SUPPORTED_MEDIUM,
-    TOOL_LOG,
+    TOOL_LOG_PATH,
     Recipe,
     RecipeError,
     Template,
@@ -22,19 +27,50 @@ from .common import (
     list_recipes,
 )
 from .generate_corpus import load_generator
-from .generate_template import TEMPLATES, generate_audio, generate_image, generate_video
-from .tools.ffmpeg import ffmpeg_available
+from .generate_template import (
+    TEMPLATES,
+    generate_audio_templates,
+    generate_image_templates,
+    generate_video_templates,
+)
+from .tools.ffmpeg import FFMPEG_MAX_OUTPUTS, ffmpeg_available
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
-
-try:
-    __version__ = version("corpus-replicator")
-except PackageNotFoundError:  # pragma: no cover
-    # package is not installed
-    __version__ = "unknown"
+    from collections.abc import Iterable, Sequence
 
 LOG = getLogger(__name__)
+# FFmpeg processes run up to FFMPEG_MAX_OUTPUTS (multithreaded) encoders each so
+# by default the number of jobs is scaled down to limit memory usage
+DEFAULT_JOBS = max((cpu_count() or 1) // FFMPEG_MAX_OUTPUTS, 1)
+# size of chunks used when reading files
+READ_CHUNK = 1024 * 1024
+
+
+class VersionAction(Action):
+    """Display the package version. The version is only looked up when requested
+    since importlib.metadata is slow to import."""
+
+    def __init__(self, option_strings: Sequence[str], **kwargs: Any) -> None:
+        kwargs.update(default=SUPPRESS, dest=SUPPRESS, nargs=0)
+        super().__init__(option_strings, **kwargs)
+
+    def __call__(  # pylint: disable=unused-argument
+        self,
+        parser: ArgumentParser,
+        namespace: Namespace,
+        values: Any,
+        option_string: str | None = None,
+    ) -> None:
+        # pylint: disable=import-outside-toplevel
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            pkg_version = version("corpus-replicator")
+        except PackageNotFoundError:  # pragma: no cover
+            # package is not installed
+            pkg_version = "unknown"
+        print(f"{parser.prog} {pkg_version}")
+        parser.exit()
 
 
 class Replicator:
@@ -50,9 +86,13 @@ class Replicator:
         self.templates: list[Template] = []
 
         # load recipe files
-        for recipe_file in set(recipes):
-            recipe = Recipe(recipe_file)
-            if self.medium == recipe.medium:
+        # remove duplicates while preserving order
+        for recipe_file in dict.fromkeys(recipes):
+            recipe = Recipe.load(recipe_file)
+            if recipe in self.recipes:
+                # the same file was provided using a different path
+                LOG.debug("'%s' is already loaded", recipe_file)
+            elif self.medium == recipe.medium:
                 self.recipes.append(recipe)
             else:
                 LOG.warning(
@@ -63,27 +103,48 @@ class Replicator:
     def __len__(self) -> int:
         return sum(len(x) for x in self.recipes) * len(self.templates)
 
-    def generate_corpus(self) -> None:
-        """Generate a corpus from recipes and templates.
+    def _generate(self, job: tuple[Recipe, Template]) -> None:
+        """Generate corpus files using a single recipe and template.
 
         Args:
+            job: Recipe and template to use.
+
+        Returns:
             None
+        """
+        recipe, template = job
+        generator = load_generator(recipe, self.dest)
+        assert generator is not None
+        generator.add_template(template)
+
+        LOG.info(
+            "Generating %d '%s' file(s) using template '%s'...",
+            len(recipe),
+            generator.description,
+            template.name,
+        )
+        # consume generator to create corpus files
+        deque(generator.generate(), maxlen=0)
+
+    def generate_corpus(self, workers: int | None = None) -> None:
+        """Generate a corpus from recipes and templates. Each recipe and template
+        combination is processed in parallel.
+
+        Args:
+            workers: Maximum number of tools to run in parallel
+                (default: DEFAULT_JOBS).
 
         Returns:
             None
         """
-        for recipe, template in product(self.recipes, self.templates):
-            generator = load_generator(recipe, self.dest)
-            assert generator is not None
-            generator.add_template(template)
-
-            LOG.info(
-                "Generating %d '%s' file(s) using template '%s'...",
-                len(recipe),
-                generator.description,
-                template.name,
-            )
-            all(generator.generate())
+        if workers is None:
+            workers = DEFAULT_JOBS
+        assert workers > 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            jobs = product(self.recipes, self.templates)
+            # consume results to raise exceptions from workers, pending jobs
+            # are cancelled if an exception is raised
+            deque(executor.map(self._generate, jobs), maxlen=0)
 
     def generate_templates(
         self,
@@ -103,27 +164,33 @@ class Replicator:
             None
         """
         # TODO: add crop or scale option for templates
-        unique_templates = set(template_names)
+        unique_templates = sorted(set(template_names))
         self.dest.mkdir(parents=True, exist_ok=True)
         LOG.debug(
             "generating %d '%s' template(s)...", len(unique_templates), self.medium
         )
-        for template in unique_templates:
-            if self.medium == "audio":
-                generated = generate_audio(template, self.dest, duration=duration)
-            elif self.medium == "image":
-                generated = generate_image(template, self.dest, resolution=resolution)
-            elif self.medium in ("animation", "video"):
-                generated = generate_video(
-                    template,
-                    self.dest,
-                    duration=duration,
-                    frames=frames,
-                    resolution=resolution,
-                )
-            else:
-                raise ValueError(f"Unknown medium '{self.medium}'")
-            self.templates.append(generated)
+        # generate all templates with a single tool process
+        if self.medium == "audio":
+            generated = generate_audio_templates(
+                unique_templates, self.dest, duration=duration
+            )
+        elif self.medium == "image":
+            generated = generate_image_templates(
+                unique_templates, self.dest, resolution=resolution
+            )
+        elif self.medium in ("animation", "video"):
+            generated = generate_video_templates(
+                unique_templates,
+                self.dest,
+                duration=duration,
+                frames=frames,
+                resolution=resolution,
+            )
+        else:
+            raise ValueError(f"Unknown medium '{self.medium}'")
+        # avoid using the same template file more than once
+        known = {x.file for x in self.templates}
+        self.templates.extend(x for x in generated if x.file not in known)
         LOG.debug(
             "generated template(s): %s", ", ".join(str(x.file) for x in self.templates)
         )
@@ -137,15 +204,34 @@ class Replicator:
         Returns:
             None
         """
-        removed = set()
-        for file_1, file_2 in product(sorted(self.dest.iterdir()), self.dest.iterdir()):
-            if file_1 in removed or file_2 in removed or file_1.samefile(file_2):
+        # only files of the same size can be duplicates
+        by_size: dict[int, list[Path]] = {}
+        with scandir(self.dest) as entries:
+            for entry in sorted(entries, key=lambda x: x.name):
+                if entry.is_file():
+                    size = entry.stat().st_size
+                    by_size.setdefault(size, []).append(Path(entry.path))
+        removed = 0
+        for files in by_size.values():
+            if len(files) < 2:
                 continue
-            if cmp(file_1, file_2, shallow=False):
-                LOG.debug("'%s' matches '%s'", file_1.name, file_2.name)
-                file_2.unlink()
-                removed.add(file_2)
-        LOG.debug("removed %d duplicate(s)", len(removed))
+            if len(files) == 2:
+                # comparing a pair directly is cheaper than hashing both files
+                groups = [files]
+            else:
+                # group files by content digest
+                by_digest: dict[bytes, list[Path]] = {}
+                for file in files:
+                    by_digest.setdefault(_digest(file), []).append(file)
+                groups = list(by_digest.values())
+            for original, *matches in groups:
+                for file in matches:
+                    # confirm content matches
+                    if _same_content(original, file):
+                        LOG.debug("'%s' matches '%s'", original.name, file.name)
+                        file.unlink()
+                        removed += 1
+        LOG.debug("removed %d duplicate(s)", removed)
 
     def remove_templates(self) -> None:
         """Remove template files.
@@ -158,6 +244,63 @@ class Replicator:
         """
         for template in self.templates:
             template.unlink()
+        # templates have been removed so calling this again is a no-op
+        self.templates.clear()
+
+
+def _digest(file: Path) -> bytes:
+    """Calculate the digest of the content of a file.
+
+    Args:
+        file: File to process.
+
+    Returns:
+        Digest of file content.
+    """
+    with file.open("rb") as in_fp:
+        if version_info >= (3, 11):
+            # pylint: disable=import-outside-toplevel
+            from hashlib import file_digest
+
+            # reads into a reusable buffer and releases the GIL while hashing
+            return file_digest(
+                in_fp, partial(blake2b, digest_size=16)  # type: ignore[arg-type]
+            ).digest()
+        hasher = blake2b(digest_size=16)
+        # read in chunks into a single buffer to limit memory usage
+        buf = bytearray(READ_CHUNK)
+        view = memoryview(buf)
+        while size := in_fp.readinto(buf):
+            hasher.update(view[:size])
+    return hasher.digest()
+
+
+def _same_content(file_1: Path, file_2: Path) -> bool:
+    """Compare the content of two files.
+
+    Args:
+        file_1: File to compare.
+        file_2: File to compare.
+
+    Returns:
+        True if the content of the files is identical otherwise False.
+    """
+    with file_1.open("rb") as fp_1, file_2.open("rb") as fp_2:
+        size = fstat(fp_1.fileno()).st_size
+        if size != fstat(fp_2.fileno()).st_size:
+            return False
+        # empty files cannot be mapped
+        if size == 0:
+            return True
+        with mmap(fp_1.fileno(), 0, access=ACCESS_READ) as map_1, mmap(
+            fp_2.fileno(), 0, access=ACCESS_READ
+        ) as map_2:
+            # compare in chunks to limit memory usage
+            for offset in range(0, size, READ_CHUNK):
+                end = offset + READ_CHUNK
+                if map_1[offset:end] != map_2[offset:end]:
+                    return False
+    return True
 
 
 def parse_args(argv: list[str] | None = None) -> Namespace:
@@ -171,6 +314,15 @@ def parse_args(argv: list[str] | None = None) -> Namespace:
         type=Path,
         help=f"Recipe files to use. Built-in recipes: {', '.join(sorted(recipes))}",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=DEFAULT_JOBS,
+        type=int,
+        help="Maximum number of tools to run in parallel. The default is tuned for "
+        f"FFmpeg which runs up to {FFMPEG_MAX_OUTPUTS} encoders per process, memory "
+        "usage increases with this value (default: %(default)s).",
+    )
     parser.add_argument(
         "--log-level",
         choices=sorted({"INFO": INFO, "DEBUG": DEBUG}),
@@ -187,8 +339,7 @@ def parse_args(argv: list[str] | None = None) -> Namespace:
     parser.add_argument(
         "--version",
         "-V",
-        action="version",
-        version=f"%(prog)s {__version__}",
+        action=VersionAction,
         help="Show version number.",
     )
     subparsers = parser.add_subparsers(
@@ -300,6 +451,9 @@ def parse_args(argv: list[str] | None = None) -> Namespace:
             checked_recipes.append(recipe)
     args.recipes = checked_recipes
 
+    if args.jobs < 1:
+        parser.error("argument -j/--jobs: must be greater than zero")
+
     if args.resolution and not is_resolution(args.resolution):
         parser.error(f"argument -r/--resolution: invalid value: {args.resolution!r}")
 
@@ -324,6 +478,8 @@ def main(argv: list[str] | None = None) -> None:
         LOG.error("Error: %s.", exc)
         return
 
+    # remove the log from a previous run so it is not reported again
+    TOOL_LOG_PATH.unlink(missing_ok=True)
     try:
         LOG.info("Generating templates...")
         replicator.generate_templates(
@@ -338,7 +494,7 @@ def main(argv: list[str] | None = None) -> None:
             len(replicator.templates),
             len(replicator),
         )
-        replicator.generate_corpus()
+        replicator.generate_corpus(workers=args.jobs)
         replicator.remove_templates()
 
         LOG.info("Optimizing corpus, checking for duplicates...")
@@ -348,9 +504,8 @@ def main(argv: list[str] | None = None) -> None:
         LOG.warning("Aborting...")
 
     finally:
-        tool_log = Path(TOOL_LOG)
-        if tool_log.is_file():
-            LOG.warning("A tool log is available '%s'.", tool_log.resolve())
+        if TOOL_LOG_PATH.is_file():
+            LOG.warning("A tool log is available '%s'.", TOOL_LOG_PATH.resolve())
         replicator.remove_templates()
 
     LOG.info("Done.")
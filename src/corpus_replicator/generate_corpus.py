@@ -4,14 +4,24 @@
 from __future__ import annotations
 
 from argparse import ArgumentParser, Namespace
+from collections import deque
 from logging import DEBUG, INFO, getLogger
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from .common import CorpusGenerator, Recipe, Template, ToolError, init_logging
 from .tools.ffmpeg import FFmpegGenerator, ffmpeg_available
 from .tools.imagemagick import ImageMagickGenerator, imagemagick_available
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 LOG = getLogger(__name__)
+# supported tools: (availability check, display name, generator)
+_TOOLS: dict[str, tuple[Callable[[], bool], str, type[CorpusGenerator]]] = {
+    "ffmpeg": (ffmpeg_available, "FFmpeg", FFmpegGenerator),
+    "imagemagick": (imagemagick_available, "ImageMagick", ImageMagickGenerator),
+}
 
 
 def load_generator(recipe: Recipe, dest: Path) -> CorpusGenerator:
@@ -24,19 +34,13 @@ def load_generator(recipe: Recipe, dest: Path) -> CorpusGenerator:
     Returns:
         A corpus generator.
     """
-    generator: CorpusGenerator | None = None
-    if recipe.tool == "ffmpeg":
-        if not ffmpeg_available():
-            raise ToolError("FFmpeg is not available")
-        generator = FFmpegGenerator(recipe, dest)
-    elif recipe.tool == "imagemagick":
-        if not imagemagick_available():
-            raise ToolError("ImageMagick is not available")
-        generator = ImageMagickGenerator(recipe, dest)
-    else:
-        raise ToolError(f"Unsupported tool {recipe.tool!r}")
-    assert generator is not None
-    return generator
+    try:
+        available, name, generator = _TOOLS[recipe.tool]
+    except KeyError:
+        raise ToolError(f"Unsupported tool {recipe.tool!r}") from None
+    if not available():
+        raise ToolError(f"{name} is not available")
+    return generator(recipe, dest)
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -47,7 +51,8 @@ def main(argv: list[str] | None = None) -> None:
     generator = load_generator(Recipe(args.recipe), args.output)
     generator.add_template(Template(args.template_name, args.template_file))
     args.output.mkdir(parents=True, exist_ok=True)
-    generator.generate()
+    # consume generator to create corpus files
+    deque(generator.generate(), maxlen=0)
 
 
 def parse_args(argv: list[str] | None = None) -> Namespace:
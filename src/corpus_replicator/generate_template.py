@@ -6,9 +6,13 @@ from __future__ import annotations
 from argparse import ArgumentParser, Namespace
 from logging import DEBUG, INFO, getLogger
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from .common import Template, init_logging, is_resolution, run_tool
-from .tools.ffmpeg import FFMPEG_BIN, ffmpeg_available
+from .tools.ffmpeg import ffmpeg_available, ffmpeg_bin
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
 
 LOG = getLogger(__name__)
 
@@ -32,60 +36,167 @@ TEMPLATES = {
 }
 
 
-def generate_audio(template: str, dest: Path, duration: float = 3.0) -> Template:
+# lavfi source, output flags and destination used to create a template
+TemplateJob = tuple[str, list[str], Path]
+
+
+def _audio_job(template: str, dest: Path, duration: float) -> TemplateJob:
+    assert duration > 0
+    assert template in TEMPLATES["audio"]
+    if template == "noise":
+        source = "anoisesrc=a=0.1:c=white"
+    elif template == "silence":
+        source = "anullsrc"
+    elif template == "sine":
+        source = "sine=frequency=880"
+    else:
+        source = "aevalsrc=sin(2*PI*(360-2.5/2)*t)|sin(2*PI*(360+2.5/2)*t)"
+    flags = ["-c:a", "pcm_s16le", "-t", f"{duration:0.0f}"]
+    return source, flags, dest / f"template-audio-{template}-{duration:0.0f}s.wav"
+
+
+def _image_job(template: str, dest: Path, resolution: str) -> TemplateJob:
+    assert template in TEMPLATES["image"]
+    if template == "noise":
+        source = f"color=c=gray:s={resolution}, noise=alls=100:allf=t"
+    elif template == "solid":
+        source = "color=c=red"
+    else:
+        source = f"testsrc=s={resolution}"
+    flags = ["-frames", "1"]
+    return source, flags, dest / f"template-image-{template}-{resolution}.png"
+
+
+def _video_job(
+    template: str, dest: Path, duration: float, frames: int, resolution: str
+) -> TemplateJob:
+    assert duration > 0 or frames > 0
+    assert template in TEMPLATES["video"]
+    if template == "noise":
+        source = f"color=c=gray:s={resolution}, noise=alls=100:allf=t"
+    elif template == "solid":
+        source = "color=c=red"
+    else:
+        source = f"testsrc2=s={resolution}"
+    flags = ["-pix_fmt", "yuv420p", "-c:v", "libx264"]
+    if frames > 0:
+        flags.extend(["-frames", str(frames)])
+        length = f"{frames}f"
+    else:
+        flags.extend(["-t", f"{duration:0.0f}"])
+        length = f"{duration:0.0f}s"
+    flags.extend(["-crf", "17"])
+    dst = dest / f"template-video-{template}-{resolution}-{length}.mp4"
+    return source, flags, dst
+
+
+def _run_jobs(
+    templates: Sequence[str], jobs: list[TemplateJob], reuse: bool
+) -> list[Template]:
+    """Create template files using a single FFmpeg process.
+
+    Args:
+        templates: Template names.
+        jobs: Details used to generate each template.
+        reuse: Skip templates that already exist.
+
+    Returns:
+        Templates containing generated content information.
+    """
+    # file names include all parameters so existing files can be reused
+    pending = [
+        job
+        for job in jobs
+        if not reuse or not job[2].is_file() or job[2].stat().st_size == 0
+    ]
+    if len(pending) < len(jobs):
+        LOG.debug("reusing %d existing template(s)", len(jobs) - len(pending))
+    if pending:
+        cmd = [ffmpeg_bin(), "-y"]
+        for source, _, _ in pending:
+            cmd.extend(["-f", "lavfi", "-i", source])
+        # each input is mapped to an output
+        for idx, (_, flags, dst) in enumerate(pending):
+            cmd.extend(["-map", str(idx)])
+            cmd.extend(flags)
+            cmd.append(str(dst))
+        run_tool(cmd)
+    return [Template(name, dst) for name, (_, _, dst) in zip(templates, jobs)]
+
+
+def generate_audio(
+    template: str, dest: Path, duration: float = 3.0, reuse: bool = False
+) -> Template:
     """Generate audio template file.
 
     Args:
         template: Content to generate.
         dest: Location to create file.
         duration: Target playback duration.
+        reuse: Use existing file if available.
 
     Returns:
         Template containing generated content information.
     """
-    assert duration > 0
-    assert template in TEMPLATES["audio"]
-    cmd = [FFMPEG_BIN, "-y", "-f", "lavfi", "-i"]
-    if template == "noise":
-        cmd.append("anoisesrc=a=0.1:c=white")
-    elif template == "silence":
-        cmd.append("anullsrc")
-    elif template == "sine":
-        cmd.append("sine=frequency=880")
-    elif template == "test":
-        cmd.append("aevalsrc=sin(2*PI*(360-2.5/2)*t)|sin(2*PI*(360+2.5/2)*t)")
-    cmd.extend(["-c:a", "pcm_s16le"])
-    cmd.extend(["-t", f"{duration:0.0f}"])
-    dst: Path = dest / f"template-audio-{template}.wav"
-    cmd.append(str(dst))
-    run_tool(cmd)
-    return Template(template, dst)
-
-
-def generate_image(template: str, dest: Path, resolution: str = "1280x768") -> Template:
+    return generate_audio_templates([template], dest, duration=duration, reuse=reuse)[0]
+
+
+def generate_audio_templates(
+    templates: Sequence[str], dest: Path, duration: float = 3.0, reuse: bool = False
+) -> list[Template]:
+    """Generate multiple audio template files using a single FFmpeg process.
+
+    Args:
+        templates: Content to generate.
+        dest: Location to create files.
+        duration: Target playback duration.
+        reuse: Use existing files if available.
+
+    Returns:
+        Templates containing generated content information.
+    """
+    jobs = [_audio_job(x, dest, duration) for x in templates]
+    return _run_jobs(templates, jobs, reuse)
+
+
+def generate_image(
+    template: str, dest: Path, resolution: str = "1280x768", reuse: bool = False
+) -> Template:
     """Generate image template file.
 
     Args:
         template: Content to generate.
         dest: Location to create file.
         resolution: Target content resolution.
+        reuse: Use existing file if available.
 
     Returns:
         Template containing generated content information.
     """
-    assert template in TEMPLATES["image"]
-    cmd = [FFMPEG_BIN, "-y", "-f", "lavfi", "-i"]
-    if template == "noise":
-        cmd.append(f"color=c=gray:s={resolution}, noise=alls=100:allf=t")
-    elif template == "solid":
-        cmd.append("color=c=red")
-    elif template == "test":
-        cmd.append(f"testsrc=s={resolution}")
-    cmd.extend(["-frames", "1"])
-    dst: Path = dest / f"template-image-{template}-{resolution}.png"
-    cmd.append(str(dst))
-    run_tool(cmd)
-    return Template(template, dst)
+    return generate_image_templates(
+        [template], dest, resolution=resolution, reuse=reuse
+    )[0]
+
+
+def generate_image_templates(
+    templates: Sequence[str],
+    dest: Path,
+    resolution: str = "1280x768",
+    reuse: bool = False,
+) -> list[Template]:
+    """Generate multiple image template files using a single FFmpeg process.
+
+    Args:
+        templates: Content to generate.
+        dest: Location to create files.
+        resolution: Target content resolution.
+        reuse: Use existing files if available.
+
+    Returns:
+        Templates containing generated content information.
+    """
+    jobs = [_image_job(x, dest, resolution) for x in templates]
+    return _run_jobs(templates, jobs, reuse)
 
 
 def generate_video(
@@ -94,6 +205,7 @@ def generate_video(
     duration: float = 2.0,
     frames: int = 0,
     resolution: str = "1280x768",
+    reuse: bool = False,
 ) -> Template:
     """Generate video template file.
 
@@ -103,30 +215,44 @@ def generate_video(
         duration: Target playback duration.
         frames: Number of frames to generate.
         resolution: Target content resolution.
+        reuse: Use existing file if available.
 
     Returns:
         Template containing generated content information.
     """
-    assert duration > 0 or frames > 0
-    assert template in TEMPLATES["video"]
-    cmd = [FFMPEG_BIN, "-y", "-f", "lavfi", "-i"]
-    if template == "noise":
-        cmd.append(f"color=c=gray:s={resolution}, noise=alls=100:allf=t")
-    elif template == "solid":
-        cmd.append("color=c=red")
-    elif template == "test":
-        cmd.append(f"testsrc2=s={resolution}")
-    cmd.extend(["-pix_fmt", "yuv420p"])
-    cmd.extend(["-c:v", "libx264"])
-    if frames > 0:
-        cmd.extend(["-frames", str(frames)])
-    else:
-        cmd.extend(["-t", f"{duration:0.0f}"])
-    cmd.extend(["-crf", "17"])
-    dst: Path = dest / f"template-video-{template}-{resolution}.mp4"
-    cmd.append(str(dst))
-    run_tool(cmd)
-    return Template(template, dst)
+    return generate_video_templates(
+        [template],
+        dest,
+        duration=duration,
+        frames=frames,
+        resolution=resolution,
+        reuse=reuse,
+    )[0]
+
+
+def generate_video_templates(
+    templates: Sequence[str],
+    dest: Path,
+    duration: float = 2.0,
+    frames: int = 0,
+    resolution: str = "1280x768",
+    reuse: bool = False,
+) -> list[Template]:
+    """Generate multiple video template files using a single FFmpeg process.
+
+    Args:
+        templates: Content to generate.
+        dest: Location to create files.
+        duration: Target playback duration.
+        frames: Number of frames to generate.
+        resolution: Target content resolution.
+        reuse: Use existing files if available.
+
+    Returns:
+        Templates containing generated content information.
+    """
+    jobs = [_video_job(x, dest, duration, frames, resolution) for x in templates]
+    return _run_jobs(templates, jobs, reuse)
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -136,9 +262,13 @@ def main(argv: list[str] | None = None) -> None:
 
     args.output.mkdir(parents=True, exist_ok=True)
     if args.medium == "audio":
-        output = generate_audio(args.template, args.output, duration=args.duration)
+        output = generate_audio(
+            args.template, args.output, duration=args.duration, reuse=args.reuse
+        )
     elif args.medium == "image":
-        output = generate_image(args.template, args.output, resolution=args.resolution)
+        output = generate_image(
+            args.template, args.output, resolution=args.resolution, reuse=args.reuse
+        )
     elif args.medium == "video":
         output = generate_video(
             args.template,
@@ -146,6 +276,7 @@ def main(argv: list[str] | None = None) -> None:
             duration=args.duration,
             frames=args.frames,
             resolution=args.resolution,
+            reuse=args.reuse,
         )
     else:  # pragma: no cover
         # this should be handle by parse_args()
@@ -171,6 +302,11 @@ def parse_args(argv: list[str] | None = None) -> Namespace:
         default="INFO",
         help="Configure console logging (default: %(default)s).",
     )
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="Do not regenerate the template if it already exists.",
+    )
     subparsers = parser.add_subparsers(dest="medium", required=True)
     # audio args
     audio = subparsers.add_parser("audio")
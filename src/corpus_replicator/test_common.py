@@ -3,9 +3,17 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this file,
 # You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from subprocess import CalledProcessError, TimeoutExpired
+
 from pytest import mark, raises
-from yaml import safe_dump
+from yaml import dump
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper
 
+from . import common
 from .common import (
     CorpusGenerator,
     Recipe,
@@ -61,6 +69,7 @@ def test_recipe_01(tmp_path):
             assert "-vbr" in flags
         else:
             assert False
+        assert isinstance(flags, tuple)
         assert len(flags) == 4
 
 
@@ -285,6 +294,21 @@ def test_recipe_01(tmp_path):
             },
             "Recipe variation name 'B@D!' is invalid",
         ),
+        # invalid variation name (trailing newline)
+        (
+            {
+                "base": {
+                    "codec": "codec",
+                    "container": "container",
+                    "library": "library",
+                    "medium": "audio",
+                    "tool": "ffmpeg",
+                    "default_flags": {},
+                },
+                "variation": {"a\n": [["-a"]]},
+            },
+            "Recipe variation name 'a\n' is invalid",
+        ),
         # invalid variation type
         (
             {
@@ -347,13 +371,36 @@ def test_recipe_02(tmp_path, data, msg):
     recipe_file = tmp_path / "recipe.yml"
     with recipe_file.open("w") as out_fp:
         if isinstance(data, dict):
-            safe_dump(data, out_fp)
+            dump(data, out_fp, Dumper=SafeDumper)
         else:
             out_fp.write(data)
     with raises(RecipeError, match=msg):
         Recipe(recipe_file)
 
 
+def test_recipe_03(mocker, tmp_path):
+    """test Recipe.load()"""
+    recipe_file = tmp_path / "recipe.yml"
+    recipe_file.write_text(SAMPLE_RECIPE)
+    recipe = Recipe.load(recipe_file)
+    assert len(recipe) == 4
+    # cached
+    load_data = mocker.patch(
+        "corpus_replicator.common._load_recipe_data", autospec=True
+    )
+    assert Recipe.load(recipe_file) is recipe
+    assert Recipe.load(tmp_path / ".." / tmp_path.name / "recipe.yml") is recipe
+    assert load_data.call_count == 0
+    mocker.stopall()
+    # modified (parsed once)
+    load_data = mocker.spy(common, "_load_recipe_data")
+    recipe_file.write_text(SAMPLE_RECIPE.replace("cbr:", "cbr2:"))
+    modified = Recipe.load(recipe_file)
+    assert modified is not recipe
+    assert {x for x, _, _ in modified} == {"cbr2", "vbr"}
+    assert load_data.call_count == 1
+
+
 def test_template_01(tmp_path):
     """test Template()"""
     template_file = tmp_path / "testfile"
@@ -381,21 +428,31 @@ def test_corpus_generator_01(mocker, tmp_path):
         library="libx264",
         medium="video",
     )
+    recipe.__iter__ = mocker.Mock(return_value=iter([("flag", 1, ("-a", "b"))]))
     generator = SimpleGenerator(recipe, tmp_path)
     generator.add_template(mocker.Mock(spec_set=Template))
     assert generator.description == "video/libx264/h264/mp4"
     all(generator.generate())
+    # pylint: disable=protected-access
+    outputs = list(generator._iter_outputs(Template("tmpl", tmp_path / "tmpl.bin")))
+    assert outputs == [
+        (("-a", "b"), str(tmp_path / "video-h264-libx264-tmpl-flag-01.mp4"))
+    ]
 
 
 @mark.parametrize(
     "resolution, result",
     [
         ("123x234", True),
+        ("123X234", True),
+        ("123x234\n", False),
         ("", False),
         ("1", False),
         ("0x1", False),
         ("1x1x1", False),
         ("-1x19", False),
+        ("01x019", True),
+        ("1x0", False),
         ("foo", False),
     ],
 )
@@ -404,19 +461,32 @@ def test_is_resolution_01(resolution, result):
     assert is_resolution(resolution) == result
 
 
-def test_run_tool_01(mocker, tmp_path):
+@mark.parametrize(
+    "exc",
+    [
+        CalledProcessError(1, ["foo"], output=b"output"),
+        TimeoutExpired(["foo"], 1, output=b"output"),
+    ],
+)
+def test_run_tool_01(mocker, tmp_path, exc):
     """test run_tool()"""
     run = mocker.patch("corpus_replicator.common.run", autospec=True)
     log = tmp_path / "log.txt"
-    mocker.patch("corpus_replicator.common.TOOL_LOG", log)
+    mocker.patch("corpus_replicator.common.TOOL_LOG_PATH", log)
     # success
     run_tool(["foo"])
     assert not log.is_file()
-    # failure (check error log exists)
-    run.side_effect = RuntimeError("foo")
-    with raises(RuntimeError):
+    assert not run.call_args[1]["close_fds"]
+    # success with a log from an earlier failure (removed by the caller at startup,
+    # not here since it may belong to a tool run by another thread)
+    log.write_bytes(b"old")
+    run_tool(["foo"])
+    assert log.read_bytes() == b"old"
+    # failure (check error log is replaced)
+    run.side_effect = exc
+    with raises(type(exc)):
         run_tool(["foo"])
-    assert log.is_file()
+    assert log.read_bytes() == b"output"
 
 
 def test_list_recipes_01():
@@ -4,44 +4,67 @@
 # You can obtain one at http://mozilla.org/MPL/2.0/.
 from pytest import mark, raises
 
-from .common import Recipe, ToolError
-from .generate_corpus import load_generator, main, parse_args
+from .common import SUPPORTED_TOOLS, Recipe, ToolError
+from .generate_corpus import _TOOLS, load_generator, main, parse_args
+from .tools.ffmpeg import FFmpegGenerator, ffmpeg_available
+from .tools.imagemagick import ImageMagickGenerator, imagemagick_available
 
 
 @mark.parametrize(
-    "tool, available, raised",
+    "tool, available, generator",
     [
         # ffmpeg exists
-        ("ffmpeg", True, False),
+        ("ffmpeg", True, FFmpegGenerator),
         # ffmpeg not available
-        ("ffmpeg", False, True),
+        ("ffmpeg", False, None),
+        # imagemagick exists
+        ("imagemagick", True, ImageMagickGenerator),
+        # imagemagick not available
+        ("imagemagick", False, None),
         # unknown tool
-        ("unknown", False, True),
+        ("unknown", False, None),
     ],
 )
-def test_load_generator_01(mocker, tmp_path, tool, available, raised):
+def test_load_generator_01(mocker, tmp_path, tool, available, generator):
     """test load_generator()"""
-    mocker.patch(
-        "corpus_replicator.generate_corpus.ffmpeg_available",
-        return_value=available,
-        autospec=True,
-    )
+    if tool in _TOOLS:
+        # only replace the availability check
+        _, name, tool_cls = _TOOLS[tool]
+        mocker.patch.dict(_TOOLS, {tool: (lambda: available, name, tool_cls)})
     recipe = mocker.Mock(spec_set=Recipe, tool=tool)
 
-    if raised:
+    if generator is None:
         with raises(ToolError):
             load_generator(recipe, tmp_path)
     else:
-        load_generator(recipe, tmp_path)
+        assert isinstance(load_generator(recipe, tmp_path), generator)
+
+
+def test_load_generator_02():
+    """test load_generator() tool table"""
+    assert set(_TOOLS) == set(SUPPORTED_TOOLS)
+    assert _TOOLS["ffmpeg"] == (ffmpeg_available, "FFmpeg", FFmpegGenerator)
+    assert _TOOLS["imagemagick"] == (
+        imagemagick_available,
+        "ImageMagick",
+        ImageMagickGenerator,
+    )
 
 
 def test_main_01(mocker, tmp_path):
     """test main()"""
-    mocker.patch("corpus_replicator.generate_corpus.load_generator", autospec=True)
+    load_gen = mocker.patch(
+        "corpus_replicator.generate_corpus.load_generator", autospec=True
+    )
     mocker.patch("corpus_replicator.generate_corpus.Recipe", autospec=True)
+    corpus = iter([tmp_path / "a", tmp_path / "b"])
+    load_gen.return_value.generate.return_value = corpus
     empty = tmp_path / "empty"
     empty.touch()
     main(["-o", str(tmp_path), str(empty), str(empty)])
+    assert load_gen.return_value.add_template.call_count == 1
+    # generator must be consumed to create the corpus
+    assert next(corpus, None) is None
 
 
 def test_parse_args_01(capsys, tmp_path):
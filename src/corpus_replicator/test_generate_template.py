@@ -8,8 +8,11 @@ from pytest import mark, raises
 from .generate_template import (
     TEMPLATES,
     generate_audio,
+    generate_audio_templates,
     generate_image,
+    generate_image_templates,
     generate_video,
+    generate_video_templates,
     main,
     parse_args,
 )
@@ -55,6 +58,54 @@ def test_generate_video_02(mocker, tmp_path, duration, frames):
     generate_video("noise", tmp_path, duration=duration, frames=frames)
 
 
+@mark.parametrize(
+    "generate, medium",
+    [
+        (generate_audio_templates, "audio"),
+        (generate_image_templates, "image"),
+        (generate_video_templates, "video"),
+    ],
+)
+def test_generate_templates_01(mocker, tmp_path, generate, medium):
+    """test generate_*_templates()"""
+    run_tool = mocker.patch(
+        "corpus_replicator.generate_template.run_tool", autospec=True
+    )
+    # nothing to generate
+    assert not generate([], tmp_path)
+    assert run_tool.call_count == 0
+    # all templates are generated by a single call
+    templates = generate(TEMPLATES[medium], tmp_path)
+    assert run_tool.call_count == 1
+    assert [x.name for x in templates] == list(TEMPLATES[medium])
+    cmd = run_tool.call_args[0][0]
+    assert cmd.count("-map") == len(TEMPLATES[medium])
+    assert all(str(x.file) in cmd for x in templates)
+
+
+def test_generate_templates_02(mocker, tmp_path):
+    """test generate_*_templates() reuse existing files"""
+    run_tool = mocker.patch(
+        "corpus_replicator.generate_template.run_tool", autospec=True
+    )
+    existing = generate_audio("noise", tmp_path)
+    existing.file.write_bytes(b"data")
+    assert run_tool.call_count == 1
+    # existing file is regenerated
+    generate_audio_templates(["noise", "sine"], tmp_path)
+    assert run_tool.call_count == 2
+    assert str(existing.file) in run_tool.call_args[0][0]
+    # existing file is reused
+    templates = generate_audio_templates(["noise", "sine"], tmp_path, reuse=True)
+    assert run_tool.call_count == 3
+    assert str(existing.file) not in run_tool.call_args[0][0]
+    assert templates[0].file == existing.file
+    # all files exist
+    templates[1].file.write_bytes(b"data")
+    generate_audio_templates(["noise", "sine"], tmp_path, reuse=True)
+    assert run_tool.call_count == 3
+
+
 @mark.parametrize(
     "medium, template",
     [
@@ -3,10 +3,13 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this file,
 # You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from hashlib import blake2b
+
 from pytest import mark, raises
 
 from .common import RecipeError
-from .core import Replicator, main, parse_args
+from .core import Replicator, _digest, _same_content, main, parse_args
+from .generate_corpus import _TOOLS
 
 SAMPLE_VIDEO_RECIPE = """
 base:
@@ -50,7 +53,8 @@ variation:
 def test_replicator_01(mocker, tmp_path, mode, recipes, templates, expected):
     """test Replicator()"""
     mocker.patch("corpus_replicator.common.run", autospec=True)
-    mocker.patch("corpus_replicator.generate_corpus.ffmpeg_available", autospec=True)
+    # only replace the availability check
+    mocker.patch.dict(_TOOLS, {"ffmpeg": (lambda: True, *_TOOLS["ffmpeg"][1:])})
     # create test template files
     recipe_path = tmp_path / "recipes"
     recipe_path.mkdir()
@@ -61,8 +65,10 @@ def test_replicator_01(mocker, tmp_path, mode, recipes, templates, expected):
     assert len(replicator) == 0
     replicator.generate_templates(templates)
     assert len(replicator) == expected
-    replicator.generate_corpus()
+    replicator.generate_corpus(workers=2)
     replicator.remove_templates()
+    assert not replicator.templates
+    assert len(replicator) == 0
 
 
 @mark.parametrize(
@@ -74,6 +80,7 @@ def test_replicator_01(mocker, tmp_path, mode, recipes, templates, expected):
         (["test1", "test2"], 2),
         (["test1", "test2", "test2"], 2),
         (["test1", "test1", "test2", "test2"], 2),
+        (["a", "test", "b", "test"], 3),
     ],
 )
 def test_replicator_02(tmp_path, file_data, final_count):
@@ -86,6 +93,40 @@ def test_replicator_02(tmp_path, file_data, final_count):
     assert sum(1 for _ in replicator.dest.iterdir()) == final_count
 
 
+def test_digest_01(tmp_path):
+    """test _digest()"""
+    (tmp_path / "1").write_bytes(b"a" * 1024 * 1024 + b"b")
+    (tmp_path / "2").write_bytes(b"a" * 1024 * 1024 + b"b")
+    (tmp_path / "3").write_bytes(b"a" * 1024 * 1024 + b"c")
+    assert _digest(tmp_path / "1") == _digest(tmp_path / "2")
+    assert _digest(tmp_path / "1") != _digest(tmp_path / "3")
+
+
+def test_digest_02(mocker, tmp_path):
+    """test _digest() without hashlib.file_digest()"""
+    mocker.patch("corpus_replicator.core.version_info", (3, 10))
+    data = b"a" * 1024 * 1024 + b"b"
+    (tmp_path / "1").write_bytes(data)
+    assert _digest(tmp_path / "1") == blake2b(data, digest_size=16).digest()
+
+
+@mark.parametrize(
+    "data_1, data_2, result",
+    [
+        (b"", b"", True),
+        (b"a", b"a", True),
+        (b"a", b"b", False),
+        (b"a", b"aa", False),
+        (b"a" * 1024 * 1024 + b"b", b"a" * 1024 * 1024 + b"c", False),
+    ],
+)
+def test_same_content_01(tmp_path, data_1, data_2, result):
+    """test _same_content()"""
+    (tmp_path / "1").write_bytes(data_1)
+    (tmp_path / "2").write_bytes(data_2)
+    assert _same_content(tmp_path / "1", tmp_path / "2") == result
+
+
 @mark.parametrize(
     "medium",
     [
@@ -101,8 +142,12 @@ def test_main_01(mocker, tmp_path, medium):
     replicator = mocker.patch("corpus_replicator.core.Replicator", autospec=True)
     empty = tmp_path / "empty"
     empty.touch()
-    mocker.patch("corpus_replicator.core.TOOL_LOG", empty)
+    # log left by a previous run
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"old")
+    mocker.patch("corpus_replicator.core.TOOL_LOG_PATH", log)
     main(["-o", str(tmp_path), str(empty), medium])
+    assert not log.is_file()
     assert replicator.return_value.generate_templates.call_count == 1
     assert replicator.return_value.generate_corpus.call_count == 1
     assert replicator.return_value.remove_duplicates.call_count == 1
@@ -138,6 +183,14 @@ def test_parse_args_01(capsys, mocker, tmp_path):
     with raises(SystemExit):
         parse_args([str(empty), "video", "-r", "foo"])
     assert "argument -r/--resolution: invalid value" in capsys.readouterr()[1]
+    # invalid jobs
+    with raises(SystemExit):
+        parse_args([str(empty), "-j", "0", "video"])
+    assert "argument -j/--jobs: must be greater than zero" in capsys.readouterr()[1]
+    # version
+    with raises(SystemExit):
+        parse_args(["--version"])
+    assert capsys.readouterr()[0].startswith("corpus-replicator ")
     # missing ffmpeg
     ffmpeg_check.return_value = False
     with raises(SystemExit):
@@ -2,17 +2,24 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 from collections.abc import Iterator
+from functools import cache
+from itertools import islice
+from os import fspath
 from pathlib import Path
 from shutil import which
 
 from ..common import CorpusGenerator, run_tool
 
 FFMPEG_BIN = "ffmpeg"
+# maximum number of outputs (encoders) per FFmpeg process
+FFMPEG_MAX_OUTPUTS = 4
 
 
 class FFmpegGenerator(CorpusGenerator):
     """FFmpeg wrapper."""
 
+    __slots__ = ()
+
     def generate(self) -> Iterator[Path]:
         """Generate corpus. Templates are combined with Recipes to create variations
         based on parameters defined in the Recipes.
@@ -25,23 +32,22 @@ class FFmpegGenerator(CorpusGenerator):
             A corpus generator.
         """
         for template in self._templates:
-            base_cmd = [FFMPEG_BIN, "-i", str(template.file), "-y"]
-            for flag, idx, variation in self._recipe:
-                # build dest file name 'video-h264-library-noise-resolution-##.mp4'
-                dest_file = self._dest / "-".join(
-                    [
-                        self._recipe.medium,
-                        self._recipe.codec,
-                        self._recipe.library,
-                        template.name,
-                        flag,
-                        f"{idx:02d}.{self._recipe.container}",
-                    ]
-                )
-                run_tool(base_cmd + variation + [str(dest_file)])
-                yield dest_file
+            outputs = self._iter_outputs(template)
+            # variations are written in batches by a single FFmpeg process so the
+            # template is decoded once per batch, batches are limited in size since
+            # each output runs its own encoder
+            while batch := list(islice(outputs, FFMPEG_MAX_OUTPUTS)):
+                cmd = [ffmpeg_bin(), "-i", fspath(template.file), "-y"]
+                for variation, dest_file in batch:
+                    # output options only apply to the output that follows them
+                    cmd.extend(variation)
+                    cmd.append(dest_file)
+                run_tool(cmd)
+                for _, dest_file in batch:
+                    yield Path(dest_file)
 
 
+@cache
 def ffmpeg_available() -> bool:
     """Check if FFmpeg is installed.
 
@@ -53,3 +59,17 @@ def ffmpeg_available() -> bool:
     """
     # TODO: check version and flags for available features?
     return which(FFMPEG_BIN) is not None
+
+
+@cache
+def ffmpeg_bin() -> str:
+    """Find the FFmpeg binary. The full path is used to avoid searching PATH each
+    time the tool is launched.
+
+    Args:
+        None
+
+    Return:
+        Path to binary if found otherwise the name of the binary.
+    """
+    return which(FFMPEG_BIN) or FFMPEG_BIN
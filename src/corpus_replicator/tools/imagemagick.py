@@ -2,6 +2,8 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 from collections.abc import Iterator
+from functools import cache
+from os import fspath
 from pathlib import Path
 from shutil import which
 
@@ -13,6 +15,8 @@ IMAGEMAGICK_BIN = "convert"
 class ImageMagickGenerator(CorpusGenerator):
     """ImageMagick wrapper."""
 
+    __slots__ = ()
+
     def generate(self) -> Iterator[Path]:
         """Generate corpus. Templates are combined with Recipes to create variations
         based on parameters defined in the Recipes.
@@ -25,23 +29,13 @@ class ImageMagickGenerator(CorpusGenerator):
             A corpus generator.
         """
         for template in self._templates:
-            base_cmd = [IMAGEMAGICK_BIN, str(template.file)]
-            for flag, idx, variation in self._recipe:
-                # build dest file name 'img-jpeg-library-noise-resolution-##.mp4'
-                dest_file = self._dest / "-".join(
-                    [
-                        self._recipe.medium,
-                        self._recipe.codec,
-                        self._recipe.library,
-                        template.name,
-                        flag,
-                        f"{idx:02d}.{self._recipe.container}",
-                    ]
-                )
-                run_tool(base_cmd + variation + [str(dest_file)])
-                yield dest_file
+            base_cmd = [imagemagick_bin(), fspath(template.file)]
+            for variation, dest_file in self._iter_outputs(template):
+                run_tool([*base_cmd, *variation, dest_file])
+                yield Path(dest_file)
 
 
+@cache
 def imagemagick_available() -> bool:
     """Check if ImageMagick is installed.
 
@@ -53,3 +47,17 @@ def imagemagick_available() -> bool:
     """
     # TODO: check version and flags for available features?
     return which(IMAGEMAGICK_BIN) is not None
+
+
+@cache
+def imagemagick_bin() -> str:
+    """Find the ImageMagick binary. The full path is used to avoid searching PATH each
+    time the tool is launched.
+
+    Args:
+        None
+
+    Return:
+        Path to binary if found otherwise the name of the binary.
+    """
+    return which(IMAGEMAGICK_BIN) or IMAGEMAGICK_BIN
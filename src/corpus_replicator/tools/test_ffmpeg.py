@@ -3,8 +3,10 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this file,
 # You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from pytest import fixture
+
 from ..common import Recipe, Template
-from .ffmpeg import FFmpegGenerator, ffmpeg_available
+from .ffmpeg import FFMPEG_BIN, FFmpegGenerator, ffmpeg_available, ffmpeg_bin
 
 SAMPLE_VIDEO_RECIPE = """
 base:
@@ -24,18 +26,42 @@ variation:
 """
 
 
+@fixture(autouse=True)
+def clear_caches():
+    """Clear cached tool lookups so mocks take effect"""
+    ffmpeg_available.cache_clear()
+    ffmpeg_bin.cache_clear()
+    yield
+    ffmpeg_available.cache_clear()
+    ffmpeg_bin.cache_clear()
+
+
 def test_ffmpeg_available_01(mocker):
     """test ffmpeg_available()"""
     which = mocker.patch("corpus_replicator.tools.ffmpeg.which", autospec=True)
     which.return_value = True
     assert ffmpeg_available()
+    # result is cached
     which.return_value = None
+    assert ffmpeg_available()
+    assert which.call_count == 1
+    ffmpeg_available.cache_clear()
     assert not ffmpeg_available()
 
 
+def test_ffmpeg_bin_01(mocker):
+    """test ffmpeg_bin()"""
+    which = mocker.patch("corpus_replicator.tools.ffmpeg.which", autospec=True)
+    which.return_value = "/path/bin"
+    assert ffmpeg_bin() == "/path/bin"
+    which.return_value = None
+    ffmpeg_bin.cache_clear()
+    assert ffmpeg_bin() == FFMPEG_BIN
+
+
 def test_ffmpeg_generator_01(mocker, tmp_path):
     """test FFmpegGenerator()"""
-    mocker.patch("corpus_replicator.tools.ffmpeg.run_tool", autospec=True)
+    run_tool = mocker.patch("corpus_replicator.tools.ffmpeg.run_tool", autospec=True)
 
     recipe_file = tmp_path / "recipe.yml"
     recipe_file.write_text(SAMPLE_VIDEO_RECIPE)
@@ -44,6 +70,7 @@ def test_ffmpeg_generator_01(mocker, tmp_path):
     template_file.touch()
 
     generator = FFmpegGenerator(Recipe(recipe_file), tmp_path / "output")
+    assert not hasattr(generator, "__dict__")
     generator.add_template(Template("template01", template_file))
     generator.add_template(Template("template02", template_file))
 
@@ -53,3 +80,32 @@ def test_ffmpeg_generator_01(mocker, tmp_path):
     assert "video-h264-libx264-template01-param-01.mp4" in corpus
     assert "video-h264-libx264-template02-param-00.mp4" in corpus
     assert "video-h264-libx264-template02-param-01.mp4" in corpus
+    # one call per template
+    assert run_tool.call_count == 2
+    cmd = run_tool.call_args[0][0]
+    assert cmd.count("flags-1") == 1
+    assert cmd.count("flags-2") == 1
+    assert cmd[-1] == str(
+        tmp_path / "output" / "video-h264-libx264-template02-param-01.mp4"
+    )
+
+
+def test_ffmpeg_generator_02(mocker, tmp_path):
+    """test FFmpegGenerator() limits outputs per process"""
+    mocker.patch("corpus_replicator.tools.ffmpeg.FFMPEG_MAX_OUTPUTS", 1)
+    run_tool = mocker.patch("corpus_replicator.tools.ffmpeg.run_tool", autospec=True)
+
+    recipe_file = tmp_path / "recipe.yml"
+    recipe_file.write_text(SAMPLE_VIDEO_RECIPE)
+
+    template_file = tmp_path / "template.bin"
+    template_file.touch()
+
+    generator = FFmpegGenerator(Recipe(recipe_file), tmp_path / "output")
+    generator.add_template(Template("template01", template_file))
+
+    assert len(list(generator.generate())) == 2
+    # one call per output
+    assert run_tool.call_count == 2
+    for call in run_tool.call_args_list:
+        assert sum(x.startswith("flags-") for x in call[0][0]) == 1
@@ -3,8 +3,15 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this file,
 # You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from pytest import fixture
+
 from ..common import Recipe, Template
-from .imagemagick import ImageMagickGenerator, imagemagick_available
+from .imagemagick import (
+    IMAGEMAGICK_BIN,
+    ImageMagickGenerator,
+    imagemagick_available,
+    imagemagick_bin,
+)
 
 SAMPLE_IMAGE_RECIPE = """
 base:
@@ -24,15 +31,39 @@ variation:
 """
 
 
+@fixture(autouse=True)
+def clear_caches():
+    """Clear cached tool lookups so mocks take effect"""
+    imagemagick_available.cache_clear()
+    imagemagick_bin.cache_clear()
+    yield
+    imagemagick_available.cache_clear()
+    imagemagick_bin.cache_clear()
+
+
 def test_imagemagick_available_01(mocker):
     """test imagemagick_available()"""
     which = mocker.patch("corpus_replicator.tools.imagemagick.which", autospec=True)
     which.return_value = True
     assert imagemagick_available()
+    # result is cached
     which.return_value = None
+    assert imagemagick_available()
+    assert which.call_count == 1
+    imagemagick_available.cache_clear()
     assert not imagemagick_available()
 
 
+def test_imagemagick_bin_01(mocker):
+    """test imagemagick_bin()"""
+    which = mocker.patch("corpus_replicator.tools.imagemagick.which", autospec=True)
+    which.return_value = "/path/bin"
+    assert imagemagick_bin() == "/path/bin"
+    which.return_value = None
+    imagemagick_bin.cache_clear()
+    assert imagemagick_bin() == IMAGEMAGICK_BIN
+
+
 def test_imagemagick_generator_01(mocker, tmp_path):
     """test ImagemagickGenerator()"""
     mocker.patch("corpus_replicator.tools.imagemagick.run_tool", autospec=True)
@@ -44,6 +75,7 @@ def test_imagemagick_generator_01(mocker, tmp_path):
     template_file.touch()
 
     generator = ImageMagickGenerator(Recipe(recipe_file), tmp_path / "output")
+    assert not hasattr(generator, "__dict__")
     generator.add_template(Template("template01", template_file))
     generator.add_template(Template("template02", template_file))
 